@@ -4,12 +4,39 @@ Generate cards.json from processed images.
 Note: Articles (der/die/das) are estimates and should be verified!
 """
 
+import argparse
+import csv
+import hashlib
 import json
 import os
+import posixpath
+import string
+import time
 from pathlib import Path
 
-ASSETS_PATH = Path("/Users/mykolakorzh/Documents/GitHub/learniq/assets/images")
-OUTPUT_PATH = Path("/Users/mykolakorzh/Documents/GitHub/learniq/assets/data/cards.json")
+PROJECT_ROOT = Path("/Users/mykolakorzh/Documents/GitHub/learniq")
+ASSETS_PATH = PROJECT_ROOT / "assets/images"
+OUTPUT_PATH = PROJECT_ROOT / "assets/data/cards.json"
+CONFUSABLES_PATH = PROJECT_ROOT / "assets/data/confusables.json"
+DIFFICULTY_PATH = PROJECT_ROOT / "assets/data/card_difficulty.json"
+IMPORT_OUTPUT_PATH = PROJECT_ROOT / "assets/data/imported_cards.json"
+COLUMNAR_PATH = PROJECT_ROOT / "assets/data/cards.columnar.json"
+PRELOAD_PLAN_PATH = PROJECT_ROOT / "assets/data/preload_plan.json"
+ASSET_MAP_PATH = PROJECT_ROOT / "assets/data/asset_map.json"  # optimize_images.py --content-addressed
+SEARCH_INDEX_DIR = PROJECT_ROOT / "assets/data"  # One search_<topic>.json per topic
+
+# Preload plan: ImageService decodes one batch at a time
+PRELOAD_PLAN_VERSION = 2  # 2: one entry per card, paths through asset_map.json
+FIRST_SCREEN_CARDS = 3  # LearnScreen shows and preloads the first 3 cards
+MAX_BATCH_BYTES = 512 * 1024  # Compressed file bytes per batch
+MAX_BATCH_PIXELS = 4 * 800 * 800  # Decoded pixels per batch (~10 MB as RGBA)
+
+# Confusable-card index
+CONFUSABLE_TOP_K = 5
+THUMBNAIL_SIZE = 16  # Images are compared as 16x16 grayscale thumbnails
+WEIGHT_ARTICLE = 1.0
+WEIGHT_SUFFIX = 1.0
+WEIGHT_VISUAL = 1.0
 
 # Known articles from existing data + common patterns
 KNOWN_ARTICLES = {
@@ -110,29 +137,95 @@ RUS_TRANSLATIONS = {
     "ruecken": "спина", "ohr": "ухо",
 }
 
-def guess_article(word):
-    """Guess article based on known words and patterns."""
-    word_lower = word.lower()
-
-    # Check known articles
-    if word_lower in KNOWN_ARTICLES:
-        return KNOWN_ARTICLES[word_lower]
-
-    # Pattern-based guessing (not always accurate!)
+# Suffix rules used when no known word matches (not always accurate!)
+PATTERN_ARTICLES = {
     # Diminutives with -chen or -lein are "das"
-    if word_lower.endswith(('chen', 'lein')):
-        return "das"
-
+    "chen": "das", "lein": "das",
     # Words ending in -ung, -heit, -keit, -schaft, -ei are usually "die"
-    if word_lower.endswith(('ung', 'heit', 'keit', 'schaft', 'ei', 'ie', 'ik', 'ion', 'taet', 'ur')):
-        return "die"
-
+    "ung": "die", "heit": "die", "keit": "die", "schaft": "die", "ei": "die",
+    "ie": "die", "ik": "die", "ion": "die", "taet": "die", "ur": "die",
     # Words ending in -er, -el, -en are often "der"
-    if word_lower.endswith(('er', 'el', 'en')):
-        return "der"
+    "er": "der", "el": "der", "en": "der",
+}
+
+MIN_HEAD_LENGTH = 3  # Shortest known word accepted as a compound head
+MIN_MODIFIER_LENGTH = 4  # Shortest prefix in front of it (Last, Kompost, Giraffe are not compounds)
+UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+class SuffixTrie:
+    """
+    Trie over reversed words: walking a noun from its last letter finds
+    every known suffix in one pass, so the longest known compound head
+    ("kuehlSCHRANK" -> "schrank") resolves in O(len(word)).
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def insert(self, word, article, source):
+        node = self.root
+        for char in reversed(word):
+            node = node.setdefault(char, {})
+        node["$"] = (article, source)
+
+    def longest_matches(self, word):
+        """Deepest (article, suffix length) per source ('word' / 'pattern')."""
+        best = {}
+        node = self.root
+        for depth, char in enumerate(reversed(word), 1):
+            node = node.get(char)
+            if node is None:
+                break
+            if "$" in node:
+                article, source = node["$"]
+                best[source] = (article, depth)
+        return best
+
+def build_article_trie():
+    trie = SuffixTrie()
+    for suffix, article in PATTERN_ARTICLES.items():
+        trie.insert(suffix, article, "pattern")
+    for word, article in KNOWN_ARTICLES.items():
+        trie.insert(word, article, "word")
+    return trie
+
+ARTICLE_TRIE = build_article_trie()
+
+def normalize_noun(word):
+    """Lowercase and spell umlauts the way KNOWN_ARTICLES does (ü -> ue)."""
+    return word.strip().lower().translate(UMLAUTS).replace(" ", "").replace("-", "")
+
+def image_stem(noun):
+    """File name stem generate_cards() reads back as noun (umlauts kept, spaces -> _)."""
+    return noun.strip().lower().replace(" ", "_")
+
+def classify_article(word):
+    """
+    Return (article, confidence) for a noun.
+
+    confidence is "known" (whole word in KNOWN_ARTICLES), "compound"
+    (longest known word it ends with), "pattern" (suffix rule) or
+    "default" (no match, "der" as the most common article).
+    """
+    word_norm = normalize_noun(word)
+    matches = ARTICLE_TRIE.longest_matches(word_norm)
+
+    if "word" in matches:
+        article, length = matches["word"]
+        if length == len(word_norm):
+            return article, "known"
+        if length >= MIN_HEAD_LENGTH and len(word_norm) - length >= MIN_MODIFIER_LENGTH:
+            return article, "compound"
+
+    if "pattern" in matches:
+        return matches["pattern"][0], "pattern"
 
     # Default to "der" if unsure (most common)
-    return "der"
+    return "der", "default"
+
+def guess_article(word):
+    """Guess article based on known words and patterns."""
+    return classify_article(word)[0]
 
 def get_translation(word):
     """Get Russian translation."""
@@ -186,17 +279,599 @@ def generate_cards():
 
     return cards
 
+# Header names accepted by --import (first match wins)
+IMPORT_COLUMNS = {
+    "noun_de": ("noun_de", "noun", "word", "wort"),
+    "article": ("article", "artikel"),
+    "translation_ru": ("translation_ru", "ru"),
+    "translation_uk": ("translation_uk", "uk"),
+    "topic_id": ("topic_id", "topic"),
+}
+
+def read_noun_rows(path):
+    """
+    Stream rows from a CSV/TSV noun list as dicts keyed like cards.json.
+
+    The delimiter comes from the extension (.tsv/.tab -> tab, otherwise
+    sniffed from the first line). With a header row, columns are matched
+    by IMPORT_COLUMNS; without one the order is noun, translation_ru,
+    translation_uk.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        first_line = f.readline()
+        if Path(path).suffix.lower() in (".tsv", ".tab"):
+            delimiter = "\t"
+        else:
+            try:
+                delimiter = csv.Sniffer().sniff(first_line, delimiters=",;\t").delimiter
+            except csv.Error:
+                delimiter = ","
+
+        first = next(csv.reader([first_line], delimiter=delimiter), [])
+        header = [name.strip().lower() for name in first]
+        columns = {}
+        for field, names in IMPORT_COLUMNS.items():
+            for name in names:
+                if name in header:
+                    columns[field] = header.index(name)
+                    break
+
+        if "noun_de" not in columns:
+            columns = {"noun_de": 0, "translation_ru": 1, "translation_uk": 2}
+            f.seek(0)
+
+        for row in csv.reader(f, delimiter=delimiter):
+            values = {field: row[i].strip() for field, i in columns.items() if i < len(row)}
+            if values.get("noun_de"):
+                yield values
+
+def import_nouns(path, default_topic, output_path=IMPORT_OUTPUT_PATH):
+    """
+    Turn a noun list into cards in one linear pass.
+
+    Cards are written as they are read (nothing is held in memory), ids
+    continue after the cards already in cards.json, and image_asset
+    follows the assets/images/<topic>/<noun>.jpg convention so
+    validate_images.py reports the images still to be added.
+    Returns the number of cards per article confidence.
+    """
+    first_id = 1
+    if OUTPUT_PATH.exists():
+        with open(OUTPUT_PATH, 'r', encoding='utf-8') as f:
+            first_id = len(json.load(f)) + 1
+
+    counts = {"given": 0, "known": 0, "compound": 0, "pattern": 0, "default": 0}
+    with open(output_path, 'w', encoding='utf-8') as out:
+        out.write("[")
+        for n, row in enumerate(read_noun_rows(path)):
+            noun = row["noun_de"]
+            topic = row.get("topic_id") or default_topic
+
+            article = row.get("article", "").lower()
+            if article in ("der", "die", "das"):
+                confidence = "given"
+            else:
+                article, confidence = classify_article(noun)
+            counts[confidence] += 1
+
+            card = {
+                "id": f"{topic}_{first_id + n:02d}",
+                "topic_id": topic,
+                "noun_de": noun[:1].upper() + noun[1:],
+                "article": article,
+                "article_confidence": confidence,
+                "phonetic": "",
+                "translation_ru": row.get("translation_ru") or get_translation(noun),
+                "translation_uk": row.get("translation_uk", ""),
+                "image_asset": f"assets/images/{topic}/{image_stem(noun)}.jpg"
+            }
+            out.write(",\n  " if n else "\n  ")
+            out.write(json.dumps(card, ensure_ascii=False))
+        out.write("\n]\n")
+
+    return counts
+
+def shared_suffix_ratio(a, b):
+    """Length of the common ending of two nouns, relative to the shorter one."""
+    a, b = a.lower(), b.lower()
+    shortest = min(len(a), len(b))
+    if shortest == 0:
+        return 0.0
+    n = 0
+    while n < shortest and a[-1 - n] == b[-1 - n]:
+        n += 1
+    return n / shortest
+
+def image_features(cards, np, Image):
+    """Downsampled, mean-centred, unit-length grayscale vectors (one row per card)."""
+    features = np.zeros((len(cards), THUMBNAIL_SIZE * THUMBNAIL_SIZE), dtype=np.float32)
+    for i, card in enumerate(cards):
+        image_path = PROJECT_ROOT / card["image_asset"]
+        try:
+            with Image.open(image_path) as img:
+                thumb = img.convert("L").resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BILINEAR)
+                features[i] = np.asarray(thumb, dtype=np.float32).ravel()
+        except OSError:
+            continue  # Missing image: zero vector, no visual similarity
+
+    features -= features.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+def build_confusables(cards, top_k=CONFUSABLE_TOP_K):
+    """
+    For each card, list the top_k most confusable cards of the same topic.
+
+    Score = same article + shared noun suffix + visual similarity of
+    downsampled images (cosine of grayscale thumbnails).
+    """
+    try:
+        import numpy as np
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("❌ --confusables needs numpy and Pillow: pip install numpy Pillow")
+
+    by_topic = {}
+    for card in cards:
+        by_topic.setdefault(card["topic_id"], []).append(card)
+
+    index = {}
+    for topic, topic_cards in by_topic.items():
+        n = len(topic_cards)
+        if n < 2:
+            index.update({card["id"]: [] for card in topic_cards})
+            continue
+
+        articles = np.array([card["article"] for card in topic_cards])
+        same_article = (articles[:, None] == articles[None, :]).astype(np.float32)
+
+        suffix = np.zeros((n, n), dtype=np.float32)
+        for i in range(n):
+            for j in range(i + 1, n):
+                ratio = shared_suffix_ratio(topic_cards[i]["noun_de"], topic_cards[j]["noun_de"])
+                suffix[i, j] = suffix[j, i] = ratio
+
+        features = image_features(topic_cards, np, Image)
+        visual = np.clip(features @ features.T, 0.0, 1.0)
+
+        score = WEIGHT_ARTICLE * same_article + WEIGHT_SUFFIX * suffix + WEIGHT_VISUAL * visual
+        np.fill_diagonal(score, -np.inf)
+
+        k = min(top_k, n - 1)
+        ranked = np.argsort(-score, axis=1, kind="stable")[:, :k]
+        for i, card in enumerate(topic_cards):
+            index[card["id"]] = [
+                {"id": topic_cards[j]["id"], "score": round(float(score[i, j]), 3)}
+                for j in ranked[i]
+            ]
+
+    return index
+
+def apply_difficulty(cards, table_path):
+    """
+    Embed difficulty from scripts/review_analytics.py and order each topic
+    easiest first. Ids are kept; cards without data go last, in file order.
+    """
+    with open(table_path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    column = table["fields"].index("difficulty")
+    difficulty = {card_id: row[column] for card_id, row in table["cards"].items()}
+
+    topic_order = {}
+    for card in cards:
+        topic_order.setdefault(card["topic_id"], len(topic_order))
+        if card["id"] in difficulty:
+            card["difficulty"] = difficulty[card["id"]]
+
+    cards.sort(key=lambda card: (
+        topic_order[card["topic_id"]],
+        "difficulty" not in card,
+        card.get("difficulty", 0.0),
+    ))
+    return sum(1 for card in cards if "difficulty" in card)
+
+# Columnar card format: fields derivable from other fields are stored as the
+# part that differs ("{}"), e.g. "ampel.jpg" for assets/images/fahrzeug/ampel.jpg
+COLUMN_TEMPLATES = {
+    "id": "{topic_id}_{}",
+    "image_asset": "assets/images/{topic_id}/{}",
+}
+
+def encode_template(values, template, cards):
+    """Residual of each value around its template, or None if any value doesn't fit."""
+    head, tail = template.split("{}")
+    residuals = []
+    for value, card in zip(values, cards):
+        prefix, suffix = head.format(**card), tail.format(**card)
+        if (not isinstance(value, str) or not value.startswith(prefix)
+                or not value.endswith(suffix) or len(value) < len(prefix) + len(suffix)):
+            return None
+        residuals.append(value[len(prefix):len(value) - len(suffix)])
+    return residuals
+
+def encode_columnar(cards):
+    """
+    Encode cards as one array per field:
+      const    - every card has the same value
+      dict     - interned string table + index per card
+      template - COLUMN_TEMPLATES residuals
+      plain    - values as is
+    Fields missing from a card are stored as null and dropped on decode.
+    """
+    fields = []
+    for card in cards:
+        fields.extend(key for key in card if key not in fields)
+
+    columns = {}
+    for field in fields:
+        values = [card.get(field) for card in cards]
+        distinct = list(dict.fromkeys(values))
+
+        if len(distinct) == 1:
+            columns[field] = {"enc": "const", "value": distinct[0]}
+            continue
+
+        if field in COLUMN_TEMPLATES:
+            residuals = encode_template(values, COLUMN_TEMPLATES[field], cards)
+            if residuals is not None:
+                columns[field] = {"enc": "template", "template": COLUMN_TEMPLATES[field], "values": residuals}
+                continue
+
+        if len(distinct) * 2 <= len(values):
+            position = {value: i for i, value in enumerate(distinct)}
+            columns[field] = {"enc": "dict", "table": distinct, "values": [position[v] for v in values]}
+        else:
+            columns[field] = {"enc": "plain", "values": values}
+
+    return {"version": 1, "count": len(cards), "fields": fields, "columns": columns}
+
+def decode_columnar(data):
+    """Inverse of encode_columnar: back to a list of card dicts."""
+    count = data["count"]
+    columns = data["columns"]
+    decoded = {}
+
+    # Templates refer to other fields, so decode them last
+    for field in sorted(data["fields"], key=lambda f: columns[f]["enc"] == "template"):
+        column = columns[field]
+        enc = column["enc"]
+        if enc == "const":
+            decoded[field] = [column["value"]] * count
+        elif enc == "dict":
+            table = column["table"]
+            decoded[field] = [table[i] for i in column["values"]]
+        elif enc == "template":
+            head, tail = column["template"].split("{}")
+            refs = [name for _, name, _, _ in string.Formatter().parse(head + tail) if name]
+            affixes = {}  # Referenced values -> formatted (prefix, suffix)
+            values = []
+            for i, value in enumerate(column["values"]):
+                key = tuple(decoded[name][i] for name in refs)
+                if key not in affixes:
+                    kwargs = dict(zip(refs, key))
+                    affixes[key] = (head.format(**kwargs), tail.format(**kwargs))
+                prefix, suffix = affixes[key]
+                values.append(prefix + value + suffix)
+            decoded[field] = values
+        else:
+            decoded[field] = column["values"]
+
+    return [
+        {field: decoded[field][i] for field in data["fields"] if decoded[field][i] is not None}
+        for i in range(count)
+    ]
+
+def compare_formats(cards, columnar, repeat=50):
+    """Round-trip check plus size and parse time of cards.json vs columnar output."""
+    pretty = json.dumps(cards, ensure_ascii=False, indent=2).encode("utf-8")
+    compact = json.dumps(cards, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    packed = json.dumps(columnar, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if decode_columnar(json.loads(packed)) != cards:
+        raise SystemExit("❌ Columnar round trip does not reproduce cards.json")
+
+    def load_time(load):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            load()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    rows = [
+        ("cards.json (indent=2)", len(pretty), load_time(lambda: json.loads(pretty))),
+        ("cards.json (minified)", len(compact), load_time(lambda: json.loads(compact))),
+        ("columnar + decode", len(packed), load_time(lambda: decode_columnar(json.loads(packed)))),
+    ]
+    print("✅ Columnar round trip verified")
+    print(f"  {'format':24} {'bytes':>9} {'load ms':>9}")
+    for name, size, ms in rows:
+        print(f"  {name:24} {size:9} {ms:9.3f}")
+    print(f"  columnar is {(1 - len(packed) / len(pretty)) * 100:.1f}% smaller than cards.json")
+
+def load_asset_map(path=ASSET_MAP_PATH):
+    """Source -> hashed path table of a content-addressed build, empty without one."""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get("assets", {})
+
+def bundled_image(card, asset_map):
+    """Path the app loads for a card's image: its content-addressed copy when there is one."""
+    image_asset = posixpath.normpath(card["image_asset"]) if card.get("image_asset") else ""
+    source = posixpath.normpath(card["image_source"]) if card.get("image_source") else image_asset
+    return asset_map.get(source, image_asset)
+
+def topic_fingerprint(topic_cards, asset_map):
+    """Hash of the plan format, batching limits, a topic's learn order and image files (size + mtime)."""
+    digest = hashlib.sha256()
+    digest.update(f"{PRELOAD_PLAN_VERSION}|{FIRST_SCREEN_CARDS}|{MAX_BATCH_BYTES}|{MAX_BATCH_PIXELS}\n".encode())
+    for card in topic_cards:
+        image_asset = bundled_image(card, asset_map)
+        image_path = PROJECT_ROOT / image_asset
+        stat = image_path.stat() if image_asset and image_path.exists() else None
+        digest.update(f"{card['id']}|{image_asset}|".encode("utf-8"))
+        digest.update(f"{stat.st_size}|{stat.st_mtime_ns}\n".encode() if stat else b"missing\n")
+    return digest.hexdigest()[:16]
+
+def plan_topic(topic_cards, Image, asset_map):
+    """
+    Split a topic's images, in learn order, into a first-screen tier and
+    bounded batches. There is one entry per card ("" when its image is
+    missing), so positions in the plan are card indexes for the app.
+    """
+    entries = []
+    for card in topic_cards:
+        image_asset = bundled_image(card, asset_map)
+        image_path = PROJECT_ROOT / image_asset
+        if not image_asset or not image_path.exists():
+            entries.append(("", 0, 0))
+            continue
+        with Image.open(image_path) as img:  # Reads the header only
+            width, height = img.size
+        entries.append((image_asset, image_path.stat().st_size, width * height))
+
+    first_screen = [path for path, _, _ in entries[:FIRST_SCREEN_CARDS]]
+    batches = []
+    batch, batch_bytes, batch_pixels = [], 0, 0
+    for path, size, pixels in entries[FIRST_SCREEN_CARDS:]:
+        if batch and (batch_bytes + size > MAX_BATCH_BYTES or batch_pixels + pixels > MAX_BATCH_PIXELS):
+            batches.append(batch)
+            batch, batch_bytes, batch_pixels = [], 0, 0
+        batch.append(path)
+        batch_bytes += size
+        batch_pixels += pixels
+    if batch:
+        batches.append(batch)
+
+    return {
+        "first_screen": first_screen,
+        "batches": batches,
+        "bytes": sum(size for _, size, _ in entries),
+        "pixels": sum(pixels for _, _, pixels in entries),
+    }
+
+def build_preload_plan(cards, plan_path=PRELOAD_PLAN_PATH):
+    """
+    Per-topic preload plan for ImageService.preloadTopic(). Image paths
+    go through asset_map.json when the build is content-addressed, so the
+    plan names the files that are actually bundled. Topics whose
+    fingerprint matches the existing plan are reused without opening any
+    image. Returns (plan, number of topics rebuilt).
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        raise SystemExit("❌ --preload-plan needs Pillow: pip install Pillow")
+
+    previous = {}
+    if plan_path.exists():
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get("topics", {})
+    asset_map = load_asset_map()
+
+    by_topic = {}
+    for card in cards:
+        by_topic.setdefault(card["topic_id"], []).append(card)
+
+    topics = {}
+    rebuilt = 0
+    for topic, topic_cards in by_topic.items():
+        fingerprint = topic_fingerprint(topic_cards, asset_map)
+        if previous.get(topic, {}).get("fingerprint") == fingerprint:
+            topics[topic] = previous[topic]
+            continue
+        topics[topic] = {"fingerprint": fingerprint, **plan_topic(topic_cards, Image, asset_map)}
+        rebuilt += 1
+
+    plan = {
+        "version": PRELOAD_PLAN_VERSION,
+        "max_batch_bytes": MAX_BATCH_BYTES,
+        "max_batch_pixels": MAX_BATCH_PIXELS,
+        "topics": topics,
+    }
+    return plan, rebuilt
+
+# Search index: noun_de ranks above translations
+SEARCH_FIELDS = {"noun_de": 3.0, "translation_ru": 2.0, "translation_uk": 2.0}
+MAX_PREFIX_LENGTH = 10
+SEARCH_FOLD = str.maketrans({"ä": "a", "ö": "o", "ü": "u", "ß": "ss", "ё": "е"})
+
+def search_tokens(text):
+    """Lowercased, umlaut/ß- and ё-folded words of a field."""
+    text = text.lower().translate(SEARCH_FOLD)
+    return [token for token in "".join(c if c.isalnum() else " " for c in text).split() if token]
+
+def search_variants(text, field):
+    """
+    Index forms of a field: folded (ü -> u), plus the ae/oe/ue spelling for
+    German so both "kuhlschrank" and "kuehlschrank" find Kühlschrank.
+    """
+    tokens = set(search_tokens(text))
+    if field == "noun_de":
+        tokens.update(search_tokens(text.lower().translate(UMLAUTS)))
+    return tokens
+
+def trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+def build_search_shard(topic_cards):
+    """
+    Prefix and trigram index for one topic (trigrams find words inside
+    compounds: "schrank" in Kühlschrank). Postings are local card numbers
+    ranked best first: field weight, then how much of the word the prefix
+    covers. Queries are normalized with search_tokens() as well.
+    """
+    prefix_scores = {}
+    trigram_scores = {}
+    for doc, card in enumerate(topic_cards):
+        for field, weight in SEARCH_FIELDS.items():
+            for token in search_variants(card.get(field, ""), field):
+                for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+                    postings = prefix_scores.setdefault(token[:length], {})
+                    postings[doc] = max(postings.get(doc, 0.0), weight + length / len(token))
+                for gram in trigrams(token):
+                    postings = trigram_scores.setdefault(gram, {})
+                    postings[doc] = max(postings.get(doc, 0.0), weight)
+
+    def ranked(index):
+        return {
+            term: sorted(postings, key=lambda doc: (-postings[doc], doc))
+            for term, postings in sorted(index.items())
+        }
+
+    return {
+        "version": 1,
+        "max_prefix": MAX_PREFIX_LENGTH,
+        "cards": [card["id"] for card in topic_cards],
+        "prefix": ranked(prefix_scores),
+        "trigram": ranked(trigram_scores),
+    }
+
+def trigram_matches(shard, token):
+    """Cards whose words contain every trigram of token, in the first trigram's order."""
+    grams = trigrams(token)
+    if not grams:
+        return []
+    postings = [shard["trigram"].get(gram, []) for gram in sorted(grams)]
+    allowed = set(postings[0]).intersection(*postings[1:])
+    return [doc for doc in postings[0] if doc in allowed]
+
+def search_shard(shard, query):
+    """
+    Reference lookup (the app should mirror it): every query word must
+    match as a prefix (when longer than max_prefix, its first max_prefix
+    letters plus all its trigrams) or, ranked below the prefix hits,
+    anywhere inside a word by all its trigrams. Results keep the ranking
+    of the first word.
+    """
+    matches = None
+    for token in search_tokens(query):
+        docs = shard["prefix"].get(token[:shard["max_prefix"]], [])
+        infix = trigram_matches(shard, token)
+        if len(token) > shard["max_prefix"]:
+            allowed = set(infix)
+            docs = [doc for doc in docs if doc in allowed]
+        seen = set(docs)
+        docs = docs + [doc for doc in infix if doc not in seen]
+        if matches is None:
+            matches = docs
+        else:
+            allowed = set(docs)
+            matches = [doc for doc in matches if doc in allowed]
+    return [shard["cards"][doc] for doc in matches or []]
+
+def build_search_index(cards):
+    """Search shards keyed by topic."""
+    by_topic = {}
+    for card in cards:
+        by_topic.setdefault(card["topic_id"], []).append(card)
+    return {topic: build_search_shard(topic_cards) for topic, topic_cards in by_topic.items()}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate cards.json from processed images.")
+    parser.add_argument("--confusables", action="store_true",
+                        help=f"also write {CONFUSABLES_PATH.name} (top-K confusable cards per card)")
+    parser.add_argument("--top-k", type=int, default=CONFUSABLE_TOP_K,
+                        help="confusable cards listed per card (default: %(default)s)")
+    parser.add_argument("--import", dest="import_path", type=Path, metavar="FILE",
+                        help=f"create cards from a CSV/TSV noun list into {IMPORT_OUTPUT_PATH.name} "
+                             "instead of scanning images")
+    parser.add_argument("--topic", default="import",
+                        help="topic for imported rows without a topic column (default: %(default)s)")
+    parser.add_argument("--difficulty", nargs="?", const=DIFFICULTY_PATH, type=Path,
+                        help="embed a per-card difficulty table and order topics easiest first "
+                             f"(default table: {DIFFICULTY_PATH.name})")
+    parser.add_argument("--preload-plan", action="store_true",
+                        help=f"also write {PRELOAD_PLAN_PATH.name} (per-topic image preload waves; "
+                             "only changed topics are rebuilt)")
+    parser.add_argument("--search-index", action="store_true",
+                        help="also write search_<topic>.json prefix/trigram indexes over noun_de, "
+                             "translation_ru and translation_uk")
+    parser.add_argument("--columnar", action="store_true",
+                        help=f"also write {COLUMNAR_PATH.name}, verify the round trip and compare "
+                             "size and load time with cards.json")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+
+    if args.import_path:
+        print(f"Importing nouns from {args.import_path}...")
+        counts = import_nouns(args.import_path, args.topic)
+        print(f"✅ Imported {sum(counts.values())} cards")
+        for confidence, count in counts.items():
+            print(f"  {confidence:9} {count}")
+        print(f"Saved to: {IMPORT_OUTPUT_PATH}")
+        print("\n⚠️  Note: Check 'compound', 'pattern' and 'default' articles!")
+        return
+
     print("Generating cards.json...")
 
     cards = generate_cards()
 
+    if args.difficulty:
+        embedded = apply_difficulty(cards, args.difficulty)
+        print(f"📊 Embedded difficulty for {embedded} cards from {args.difficulty}")
+
     # Write to file
     with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
         json.dump(cards, f, ensure_ascii=False, indent=2)
 
     print(f"✅ Generated {len(cards)} cards")
     print(f"Saved to: {OUTPUT_PATH}")
+
+    if args.preload_plan:
+        plan, rebuilt = build_preload_plan(cards)
+        with open(PRELOAD_PLAN_PATH, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False, indent=2)
+        print(f"✅ Preload plan for {len(plan['topics'])} topics ({rebuilt} rebuilt) saved to: {PRELOAD_PLAN_PATH}")
+
+    if args.search_index:
+        shards = build_search_index(cards)
+        for topic, shard in shards.items():
+            with open(SEARCH_INDEX_DIR / f"search_{topic}.json", 'w', encoding='utf-8') as f:
+                json.dump(shard, f, ensure_ascii=False, separators=(",", ":"))
+        # Shards of topics that no longer have cards
+        for stale in SEARCH_INDEX_DIR.glob("search_*.json"):
+            if stale.stem[len("search_"):] not in shards:
+                stale.unlink()
+                print(f"🗑  Removed stale search shard: {stale.name}")
+        terms = sum(len(shard["prefix"]) + len(shard["trigram"]) for shard in shards.values())
+        print(f"✅ Search index: {len(shards)} topic shards, {terms} terms in {SEARCH_INDEX_DIR}")
+
+    if args.columnar:
+        columnar = encode_columnar(cards)
+        compare_formats(cards, columnar)
+        with open(COLUMNAR_PATH, 'w', encoding='utf-8') as f:
+            json.dump(columnar, f, ensure_ascii=False, separators=(",", ":"))
+        print(f"Saved to: {COLUMNAR_PATH}")
+
+    if args.confusables:
+        confusables = build_confusables(cards, args.top_k)
+        with open(CONFUSABLES_PATH, 'w', encoding='utf-8') as f:
+            json.dump(confusables, f, ensure_ascii=False, separators=(",", ":"))
+        print(f"✅ Confusable index for {len(confusables)} cards saved to: {CONFUSABLES_PATH}")
+
     print("\n⚠️  Note: Articles (der/die/das) are estimates. Please verify!")
 
 if __name__ == "__main__":
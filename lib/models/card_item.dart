@@ -10,6 +10,9 @@ class CardItem {
   final String translationUk;
   final String imageAsset;
 
+  /// Gray variant for the quiz; empty means derive it from [imageAsset]
+  final String imageGrayAsset;
+
   CardItem({
     required this.id,
     required this.topicId,
@@ -19,6 +22,7 @@ class CardItem {
     required this.translationRu,
     required this.translationUk,
     required this.imageAsset,
+    this.imageGrayAsset = '',
   });
 
   factory CardItem.fromJson(Map<String, dynamic> json) {
@@ -33,6 +37,7 @@ class CardItem {
       translationRu: json['translation_ru'] as String,
       translationUk: json['translation_uk'] as String,
       imageAsset: imageAsset,
+      imageGrayAsset: json['image_gray_asset'] as String? ?? '',
     );
   }
 
@@ -25,6 +25,7 @@ class _LearnScreenState extends State<LearnScreen> {
   late Future<List<CardItem>> _cardsFuture;
   late PageController _pageController;
   int _currentIndex = 0;
+  int _preloadGeneration = 0; // Bumped to cancel in-flight preload waves
   final Set<String> _reviewedCardIds = {}; // Track which cards have been reviewed for streak
 
   @override
@@ -32,10 +33,12 @@ class _LearnScreenState extends State<LearnScreen> {
     super.initState();
     _pageController = PageController();
     _cardsFuture = DataService.loadCardsForTopic(widget.topicId);
+    _preloadNextImages(0);
   }
 
   @override
   void dispose() {
+    _preloadGeneration++;
     _pageController.dispose();
     super.dispose();
   }
@@ -65,20 +68,27 @@ class _LearnScreenState extends State<LearnScreen> {
   }
 
   void _preloadNextImages(int currentIndex) {
+    final generation = ++_preloadGeneration;
     _cardsFuture.then((cards) {
-      if (cards.isEmpty) return;
+      if (cards.isEmpty || !mounted || generation != _preloadGeneration) return;
       
-      final imagesToPreload = <String>[];
+      // Used when the build-time plan has no entry for this topic
+      final fallbackPaths = <String>[];
       for (int i = currentIndex + 1; i <= currentIndex + 3 && i < cards.length; i++) {
         final imagePath = cards[i].getImagePathWithFallback();
         if (imagePath.isNotEmpty) {
-          imagesToPreload.add(imagePath);
+          fallbackPaths.add(imagePath);
         }
       }
       
-      if (imagesToPreload.isNotEmpty) {
-        ImageService.preloadImages(imagesToPreload);
-      }
+      // Warm the batches around the current card from the plan; a newer
+      // page change or dispose stops the remaining waves
+      ImageService.preloadTopic(
+        widget.topicId,
+        fromIndex: currentIndex,
+        fallbackPaths: fallbackPaths,
+        isCancelled: () => !mounted || generation != _preloadGeneration,
+      );
     });
   }
 
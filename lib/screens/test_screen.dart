@@ -468,7 +468,10 @@ class _TestScreenState extends State<TestScreen> {
 
     final currentCard = _quizCards[_currentQuestionIndex];
     final baseImagePath = currentCard.getImagePathWithFallback();
-    final grayImagePath = _getGrayImagePath(baseImagePath);
+    // Content-addressed cards name their gray variant explicitly
+    final grayImagePath = currentCard.imageGrayAsset.isNotEmpty
+        ? currentCard.imageGrayAsset
+        : _getGrayImagePath(baseImagePath);
     final colorfulImagePath = baseImagePath;
 
     return Scaffold(
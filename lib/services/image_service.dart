@@ -1,5 +1,7 @@
 import 'package:flutter/material.dart';
+import 'package:flutter/services.dart';
 import 'dart:async';
+import 'dart:convert';
 
 /// Centralized image loading service with caching and preloading support
 class ImageService {
@@ -9,6 +11,9 @@ class ImageService {
   // Track which images are being loaded
   static final Set<String> _loadingImages = {};
 
+  // Build-time preload plan per topic (generate_cards.py --preload-plan)
+  static Map<String, dynamic>? _preloadPlan;
+
   /// Preload an image asset
   /// Returns true if preload was successful or already cached
   static Future<bool> preloadImage(String imagePath) async {
@@ -61,6 +66,98 @@ class ImageService {
     await Future.wait(futures, eagerError: false);
   }
 
+  /// Load the preload plan once; empty if the asset is missing or invalid
+  static Future<Map<String, dynamic>> _loadPreloadPlan() async {
+    if (_preloadPlan != null) {
+      return _preloadPlan!;
+    }
+
+    try {
+      final response = await rootBundle.loadString('assets/data/preload_plan.json');
+      final decoded = json.decode(response);
+      final topics = decoded is Map<String, dynamic> ? decoded['topics'] : null;
+      _preloadPlan = topics is Map<String, dynamic> ? topics : {};
+    } catch (e) {
+      debugPrint('No image preload plan: $e');
+      _preloadPlan = {};
+    }
+    return _preloadPlan!;
+  }
+
+  /// Replace the loaded preload plan (null reloads it from the asset)
+  @visibleForTesting
+  static void setPreloadPlan(Map<String, dynamic>? topics) {
+    _preloadPlan = topics;
+  }
+
+  /// Waves of a topic's plan covering cards from [fromIndex] on, at most
+  /// [maxBatches] batches ahead. The first-screen tier counts as a batch.
+  /// The plan has one entry per card, '' where a card has no image, so
+  /// positions line up with card indexes; the empty entries are dropped.
+  static List<List<String>> topicWaves(
+    Map<String, dynamic> topic, {
+    int fromIndex = 0,
+    int maxBatches = 2,
+  }) {
+    final waves = <List<String>>[];
+    final firstScreen = topic['first_screen'];
+    if (firstScreen is List) {
+      waves.add(firstScreen.whereType<String>().toList());
+    }
+    final batches = topic['batches'];
+    if (batches is List) {
+      for (final batch in batches.whereType<List>()) {
+        waves.add(batch.whereType<String>().toList());
+      }
+    }
+
+    // Skip waves the learner has already paged past
+    var start = 0;
+    var cardsBefore = 0;
+    while (start < waves.length && cardsBefore + waves[start].length <= fromIndex) {
+      cardsBefore += waves[start].length;
+      start++;
+    }
+    final end = start + maxBatches < waves.length ? start + maxBatches : waves.length;
+    return waves
+        .sublist(start, end)
+        .map((wave) => wave.where((path) => path.isNotEmpty).toList())
+        .toList();
+  }
+
+  /// Preload a topic's images in bounded waves
+  /// Only the [maxBatches] batches around [fromIndex] are loaded, each one
+  /// awaited before the next starts, so large topics don't decode every
+  /// image at once. [isCancelled] is checked between waves (e.g. the screen
+  /// was disposed or the learner moved on). Topics without a plan fall back
+  /// to [fallbackPaths].
+  static Future<void> preloadTopic(
+    String topicId, {
+    int fromIndex = 0,
+    int maxBatches = 2,
+    List<String> fallbackPaths = const [],
+    bool Function()? isCancelled,
+  }) async {
+    final plan = await _loadPreloadPlan();
+    if (isCancelled != null && isCancelled()) {
+      return;
+    }
+
+    final topic = plan[topicId];
+    if (topic is! Map<String, dynamic>) {
+      await preloadImages(fallbackPaths);
+      return;
+    }
+
+    final waves = topicWaves(topic, fromIndex: fromIndex, maxBatches: maxBatches);
+    for (final wave in waves) {
+      if (isCancelled != null && isCancelled()) {
+        return;
+      }
+      await preloadImages(wave);
+    }
+  }
+
   /// Clear the image cache
   static void clearCache() {
     _imageCache.clear();
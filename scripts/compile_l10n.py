@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Localization Bundle Compiler for LearnIQ
+Tokenizes lib/**/*.dart once into a key-usage index, checks key parity
+across en/ru/uk and writes minimal per-locale tables with only the keys
+the code references.
+
+Sources:
+  - lib/l10n/*.arb              (gen-l10n, keys used as l10n.someKey)
+  - assets/l10n/*.json          (dotted keys used as string literals)
+  - lib/l10n/*.json             (copies of the above, checked for drift)
+
+Tokenized files are cached by content hash in .l10n_cache.json, so reruns
+only re-read Dart files that changed.
+
+Usage:
+    python3 scripts/compile_l10n.py              # report + build/l10n/
+    python3 scripts/compile_l10n.py --strict     # exit 1 on missing keys
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+LIB_DIR = Path('lib')
+ARB_DIR = Path('lib/l10n')
+ARB_TEMPLATE = 'app_en.arb'
+JSON_DIRS = [Path('assets/l10n'), Path('lib/l10n')]
+OUTPUT_DIR = Path('build/l10n')
+CACHE_PATH = Path('.l10n_cache.json')
+
+# Generated by gen-l10n from the ARB files, not real usages
+GENERATED_PREFIX = 'app_localizations'
+
+# One pass over the source: comments are skipped, string literals and
+# member accesses (.name / ?.name) are collected
+TOKEN = re.compile(
+    r"//[^\n]*"
+    r"|/\*.*?\*/"
+    r"|(?P<quote>'''|\"\"\"|'|\")(?P<string>(?:\\.|(?!(?P=quote)).)*)(?P=quote)"
+    r"|\??\.\s*(?P<member>[A-Za-z_]\w*)",
+    re.DOTALL,
+)
+INTERPOLATED_MEMBER = re.compile(r"\.\s*([A-Za-z_]\w*)")
+
+
+def tokenize(source):
+    """Member names and string literal contents used in a Dart file"""
+    members = set()
+    strings = set()
+    for match in TOKEN.finditer(source):
+        if match.group('member'):
+            members.add(match.group('member'))
+        elif match.group('quote'):
+            text = match.group('string')
+            strings.add(text)
+            # '${l10n.someKey}' inside a string is still a usage
+            members.update(INTERPOLATED_MEMBER.findall(text))
+    return members, strings
+
+
+def load_cache():
+    if not CACHE_PATH.exists():
+        return {}
+    try:
+        with open(CACHE_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return {}
+
+
+def build_usage_index():
+    """Union of members and strings over lib/**/*.dart, returns (members, strings, reparsed, total)"""
+    cache = load_cache()
+    new_cache = {}
+    members = set()
+    strings = set()
+    reparsed = 0
+
+    dart_files = sorted(path for path in LIB_DIR.rglob('*.dart')
+                        if not path.name.startswith(GENERATED_PREFIX))
+    for path in dart_files:
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        key = path.as_posix()
+
+        entry = cache.get(key)
+        if entry is None or entry.get('hash') != digest:
+            file_members, file_strings = tokenize(data.decode('utf-8'))
+            entry = {'hash': digest, 'members': sorted(file_members), 'strings': sorted(file_strings)}
+            reparsed += 1
+
+        new_cache[key] = entry
+        members.update(entry['members'])
+        strings.update(entry['strings'])
+
+    with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+        json.dump(new_cache, f, ensure_ascii=False, separators=(',', ':'))
+
+    return members, strings, reparsed, len(dart_files)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def message_keys(table):
+    """Translatable keys of an ARB/JSON table (no @ metadata)"""
+    return {key for key in table if not key.startswith('@')}
+
+
+def strip_table(table, keep):
+    """Table with only the kept keys and their @key metadata (plus @@locale etc.)"""
+    return {
+        key: value for key, value in table.items()
+        if key.startswith('@@') or key in keep or (key.startswith('@') and key[1:] in keep)
+    }
+
+
+def compile_arb(members, report):
+    """Check ARB parity and write stripped ARB files"""
+    arb_files = {path.name: load_json(path) for path in sorted(ARB_DIR.glob('*.arb'))}
+    template_keys = message_keys(arb_files[ARB_TEMPLATE])
+    used = {key for key in template_keys if key in members}
+
+    report['arb'] = {'template_keys': len(template_keys), 'used': len(used), 'locales': {}}
+    for name, table in arb_files.items():
+        keys = message_keys(table)
+        report['arb']['locales'][name] = {
+            'keys': len(keys),
+            'kept': len(keys & used),
+            'dead': sorted((keys & template_keys) - used),
+            'missing': sorted(template_keys - keys),
+            'not_in_template': sorted(keys - template_keys),
+        }
+        write_table(OUTPUT_DIR / name, strip_table(table, used))
+
+
+def compile_json(strings, report):
+    """Check parity of the dotted-key JSON tables and write stripped copies"""
+    report['json'] = {}
+    tables = {}
+    for json_dir in JSON_DIRS:
+        for path in sorted(json_dir.glob('*.json')):
+            tables[path.as_posix()] = load_json(path)
+
+    all_keys = set()
+    for table in tables.values():
+        all_keys |= message_keys(table)
+    used = {key for key in all_keys if key in strings}
+
+    by_name = {}
+    for path, table in tables.items():
+        keys = message_keys(table)
+        report['json'][path] = {
+            'keys': len(keys),
+            'kept': len(keys & used),
+            'dead': sorted(keys - used),
+            'missing': sorted(all_keys - keys),
+        }
+        by_name.setdefault(Path(path).name, []).append((path, table))
+
+    # Same file name in assets/l10n and lib/l10n: one output, flag drift
+    for name, copies in by_name.items():
+        first_path, first = copies[0]
+        for path, table in copies[1:]:
+            if table != first:
+                report['json'][path]['differs_from'] = first_path
+        write_table(OUTPUT_DIR / name, strip_table(first, used))
+
+
+def write_table(path, table):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def print_report(report):
+    arb = report['arb']
+    print(f"\nARB: {arb['used']}/{arb['template_keys']} template keys referenced")
+    for name, info in arb['locales'].items():
+        print(f"  {name:12} kept {info['kept']:3}/{info['keys']:3}  dead {len(info['dead']):3}  "
+              f"missing {len(info['missing']):3}  not in template {len(info['not_in_template']):3}")
+        for key in info['missing'][:10]:
+            print(f"    ❌ missing: {key}")
+
+    print("\nJSON tables:")
+    for path, info in report['json'].items():
+        drift = f"  ⚠️  differs from {info['differs_from']}" if 'differs_from' in info else ''
+        print(f"  {path:28} kept {info['kept']:3}/{info['keys']:3}  dead {len(info['dead']):3}  "
+              f"missing {len(info['missing']):3}{drift}")
+        for key in info['missing'][:10]:
+            print(f"    ❌ missing: {key}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compile minimal localization tables')
+    parser.add_argument('--strict', action='store_true',
+                        help='exit with 1 if any locale is missing a key')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # Change to project root
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    os.chdir(project_root)
+
+    print("LearnIQ Localization Compiler")
+    print("=" * 60)
+
+    members, strings, reparsed, total = build_usage_index()
+    print(f"Tokenized {reparsed}/{total} Dart files ({total - reparsed} cached)")
+
+    report = {}
+    compile_arb(members, report)
+    compile_json(strings, report)
+    print_report(report)
+
+    with open(OUTPUT_DIR / 'report.json', 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nMinimal tables and report.json written to {OUTPUT_DIR}/")
+
+    missing = any(info['missing'] for info in report['arb']['locales'].values())
+    missing = missing or any(info['missing'] for info in report['json'].values())
+    exit(1 if args.strict and missing else 0)
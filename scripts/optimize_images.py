@@ -3,114 +3,614 @@
 Image Optimization Script for LearnIQ
 Reduces image sizes from ~2.5MB to ~100KB while maintaining quality
 Target: Reduce 763MB total to ~20MB
+
+Usage:
+    python3 scripts/optimize_images.py                      # optimize in place
+    python3 scripts/optimize_images.py --resume             # continue an interrupted run
+    python3 scripts/optimize_images.py --restart            # discard the journal, optimize again
+    python3 scripts/optimize_images.py --content-addressed  # hashed copies + asset_map.json
+    python3 scripts/optimize_images.py --content-addressed --perceptual  # lowest quality above an SSIM floor
 """
 
+import argparse
+import csv
+import hashlib
+import io
+import json
 import os
+import posixpath
 import sys
 from PIL import Image
 from pathlib import Path
 
+from prune_assets import MANIFEST_PATH, gray_variants, write_manifest
+
+try:
+    import numpy as np
+except ImportError:  # Only needed for --perceptual
+    np = None
+
 # Configuration
 MAX_WIDTH = 800  # Max width for images
 MAX_HEIGHT = 800  # Max height for images
 QUALITY = 85  # JPEG quality (85 is good balance)
 TARGET_SIZE_KB = 150  # Target max size per image
 
+# Content-addressed output
+CAS_DIR = 'assets/cas'  # Bundled through the asset manifest instead of the topic folders
+CARDS_PATH = 'assets/data/cards.json'
+ASSET_MAP_PATH = 'assets/data/asset_map.json'
+HASH_LENGTH = 16  # Hex digits of SHA-256 kept in the file name
+
+# Crash safety: outputs are renamed into place, finished items journaled
+JOURNAL_PATH = 'optimize_journal.jsonl'
+TEMP_SUFFIX = '.optimizing.tmp'
+
+# Perceptual encoding (--perceptual)
+SSIM_FLOOR = 0.985  # Minimum luma MS-SSIM against the resized source
+CHROMA_FLOOR = 0.95  # Minimum Cb/Cr SSIM, keeps 4:2:0 off sharp colour edges
+MIN_QUALITY = 40
+MAX_QUALITY = 95
+SUBSAMPLING = {'4:4:4': 0, '4:2:0': 2}
+REPORT_PATH = 'image_quality_report.csv'
+MS_SSIM_WEIGHTS = (0.0448, 0.2856, 0.3001, 0.2363, 0.1333)
+SSIM_WINDOW = 11  # Gaussian window; smaller images can't be scored
+
+def prepare_image(img):
+    """Flatten transparency onto white and downscale to MAX_WIDTH x MAX_HEIGHT"""
+    # Convert to RGB if necessary (for PNGs with transparency)
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Create white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Resize if too large
+    width, height = img.size
+    if width > MAX_WIDTH or height > MAX_HEIGHT:
+        img.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
+
+    return img
+
+def gaussian_blur(planes, size=SSIM_WINDOW, sigma=1.5):
+    """Separable Gaussian filter over the last two axes, 'valid' region only"""
+    x = np.arange(size) - (size - 1) / 2
+    kernel = np.exp(-x ** 2 / (2 * sigma ** 2)).astype(np.float32)
+    kernel /= kernel.sum()
+    height, width = planes.shape[-2:]
+    rows = sum(k * planes[..., :, i:width - size + 1 + i] for i, k in enumerate(kernel))
+    return sum(k * rows[..., i:height - size + 1 + i, :] for i, k in enumerate(kernel))
+
+def ssim_components(a, b):
+    """Mean SSIM and mean contrast-structure term of two float planes (0-255)"""
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    # One filter pass over all five statistics
+    mu_a, mu_b, aa, bb, ab = gaussian_blur(np.stack([a, b, a * a, b * b, a * b]))
+    var_a = aa - mu_a ** 2
+    var_b = bb - mu_b ** 2
+    cov = ab - mu_a * mu_b
+    cs = (2 * cov + c2) / (var_a + var_b + c2)
+    luminance = (2 * mu_a * mu_b + c1) / (mu_a ** 2 + mu_b ** 2 + c1)
+    return float(np.mean(luminance * cs)), float(np.mean(cs))
+
+def downsample(plane):
+    """2x2 average pooling"""
+    h, w = plane.shape[0] // 2 * 2, plane.shape[1] // 2 * 2
+    plane = plane[:h, :w]
+    return (plane[0::2, 0::2] + plane[1::2, 0::2] + plane[0::2, 1::2] + plane[1::2, 1::2]) / 4
+
+def ms_ssim(a, b):
+    """Multi-scale SSIM; uses fewer scales when the image is too small for five"""
+    scales = len(MS_SSIM_WEIGHTS)
+    while scales > 1 and min(a.shape) / 2 ** (scales - 1) < SSIM_WINDOW:
+        scales -= 1
+    weights = np.array(MS_SSIM_WEIGHTS[:scales])
+    weights /= weights.sum()
+
+    result = 1.0
+    for scale in range(scales):
+        ssim, cs = ssim_components(a, b)
+        if scale == scales - 1:
+            result *= max(ssim, 0.0) ** weights[scale]
+        else:
+            result *= max(cs, 0.0) ** weights[scale]
+            a, b = downsample(a), downsample(b)
+    return result
+
+def ycbcr_planes(img):
+    return [np.asarray(plane, dtype=np.float32) for plane in img.convert('YCbCr').split()]
+
+def encode_candidate(img, quality, subsampling, progressive=False):
+    buffer = io.BytesIO()
+    img.save(buffer, 'JPEG', quality=quality, subsampling=subsampling,
+             progressive=progressive, optimize=True)
+    return buffer.getvalue()
+
+def score_candidate(reference, data):
+    """(luma MS-SSIM, min chroma SSIM) of an encoding against the reference planes"""
+    with Image.open(io.BytesIO(data)) as decoded:
+        y, cb, cr = ycbcr_planes(decoded)
+    luma = ms_ssim(reference[0], y)
+    chroma = min(ssim_components(reference[1], cb)[0], ssim_components(reference[2], cr)[0])
+    return luma, chroma
+
+def choose_encoding(img, ssim_floor=SSIM_FLOOR):
+    """
+    Lowest JPEG quality (binary search per chroma subsampling) whose decode
+    stays above ssim_floor on luma and CHROMA_FLOOR on chroma, then the
+    smaller of baseline/progressive (same pixels). Falls back to
+    MAX_QUALITY 4:4:4 when nothing passes, and to the fixed QUALITY for
+    images too small for the 11 px SSIM window (passed is None: unscored).
+    Returns (data, report row).
+    """
+    if min(img.size) < SSIM_WINDOW:
+        data = encode_candidate(img, QUALITY, SUBSAMPLING['4:2:0'])
+        return data, {'quality': QUALITY, 'subsampling': '4:2:0', 'progressive': False,
+                      'ms_ssim': None, 'chroma_ssim': None, 'passed': None}
+
+    reference = ycbcr_planes(img)
+    best = None
+
+    for name, subsampling in SUBSAMPLING.items():
+        low, high = MIN_QUALITY, MAX_QUALITY
+        found = None
+        while low <= high:
+            quality = (low + high) // 2
+            data = encode_candidate(img, quality, subsampling)
+            luma, chroma = score_candidate(reference, data)
+            if luma >= ssim_floor and chroma >= CHROMA_FLOOR:
+                found = (quality, data, luma, chroma)
+                high = quality - 1
+            else:
+                low = quality + 1
+        if found is None:
+            continue
+
+        quality, data, luma, chroma = found
+        progressive = encode_candidate(img, quality, subsampling, progressive=True)
+        is_progressive = len(progressive) < len(data)
+        if is_progressive:
+            data = progressive
+
+        if best is None or len(data) < len(best[0]):
+            best = (data, {'quality': quality, 'subsampling': name, 'progressive': is_progressive,
+                           'ms_ssim': round(luma, 4), 'chroma_ssim': round(chroma, 4),
+                           'passed': True})
+
+    if best is None:
+        data = encode_candidate(img, MAX_QUALITY, SUBSAMPLING['4:4:4'])
+        luma, chroma = score_candidate(reference, data)
+        best = (data, {'quality': MAX_QUALITY, 'subsampling': '4:4:4', 'progressive': False,
+                       'ms_ssim': round(luma, 4), 'chroma_ssim': round(chroma, 4),
+                       'passed': False})
+    return best
+
+def encode_output(img, ssim_floor=None, report=None, name=''):
+    """JPEG bytes at the fixed QUALITY, or perceptually chosen when ssim_floor is set"""
+    if ssim_floor is None:
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=QUALITY, optimize=True)
+        return buffer.getvalue()
+
+    data, row = choose_encoding(img, ssim_floor)
+    if report is not None:
+        report.append({'image': name, 'bytes': len(data), **row})
+    return data
+
+def write_report(report, path):
+    """Per-image quality scores, so regressions show up in review"""
+    fields = ['image', 'bytes', 'quality', 'subsampling', 'progressive', 'ms_ssim', 'chroma_ssim', 'passed']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(report)
+
+    below = sum(1 for row in report if row['passed'] is False)
+    unscored = sum(1 for row in report if row['passed'] is None)
+    print(f"Quality report: {path} ({len(report)} images, {below} below floor, {unscored} too small to score)")
+
+def write_atomic(path, data):
+    """Write to a temp file next to path, fsync, then rename over path"""
+    tmp_path = path + TEMP_SUFFIX
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 def optimize_image(input_path, output_path=None):
-    """Optimize a single image file"""
+    """
+    Optimize a single image file. A PNG converted to JPEG is left in place;
+    the caller removes it once the conversion is journaled.
+    """
     if output_path is None:
         output_path = input_path
 
     try:
         with Image.open(input_path) as img:
-            # Convert to RGB if necessary (for PNGs with transparency)
-            if img.mode in ('RGBA', 'LA', 'P'):
-                # Create white background
-                background = Image.new('RGB', img.size, (255, 255, 255))
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-                img = background
-            elif img.mode != 'RGB':
-                img = img.convert('RGB')
-
-            # Resize if too large
-            width, height = img.size
-            if width > MAX_WIDTH or height > MAX_HEIGHT:
-                img.thumbnail((MAX_WIDTH, MAX_HEIGHT), Image.Resampling.LANCZOS)
+            img = prepare_image(img)
 
             # Get file extension
             ext = os.path.splitext(output_path)[1].lower()
 
             # Save with optimization
             if ext in ['.jpg', '.jpeg']:
-                img.save(output_path, 'JPEG', quality=QUALITY, optimize=True)
+                data = encode_output(img)
+                write_atomic(output_path, data)
             elif ext == '.png':
                 # Convert PNG to JPEG for smaller size
                 jpg_path = output_path.rsplit('.', 1)[0] + '.jpg'
-                img.save(jpg_path, 'JPEG', quality=QUALITY, optimize=True)
-                # Remove original PNG if JPEG is smaller
-                if os.path.exists(output_path) and os.path.exists(jpg_path):
-                    if os.path.getsize(jpg_path) < os.path.getsize(output_path):
-                        os.remove(output_path)
-                        return jpg_path
+                data = encode_output(img)
+                # Keep the original PNG (and write no JPEG) unless JPEG is smaller
+                if len(data) >= os.path.getsize(output_path):
+                    return output_path
+                write_atomic(jpg_path, data)
+                return jpg_path
 
             return output_path
     except Exception as e:
         print(f"Error optimizing {input_path}: {e}")
         return None
 
+class Journal:
+    """
+    Append-only log of finished images, one JSON object per line.
+
+    An entry is written (and fsynced) only after the image's output has
+    been renamed into place, so every journaled item is complete on disk.
+    A crash can at worst leave a torn last line, which is ignored.
+
+    Without resume an existing journal with entries is only replaced when
+    restart is set: its images are already optimized in place, encoding
+    them again would add another round of JPEG loss.
+    """
+
+    def __init__(self, path, resume, restart=False):
+        self.path = path
+        self.entries = []
+        self.committed = 0  # Entries written by this run
+        if not resume and not restart and os.path.exists(path) and os.path.getsize(path) > 0:
+            raise SystemExit(f"Error: {path} lists images finished by an earlier run. "
+                             "Continue with --resume, or start over with --restart "
+                             "(re-encodes images that are already optimized)")
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.entries.append(json.loads(line))
+                    except ValueError:
+                        break  # Torn write from an interrupted run
+            # Drop the torn tail so new entries start on a clean line
+            valid = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in self.entries)
+            write_atomic(path, valid.encode('utf-8'))
+        self.outputs = {entry['source']: entry.get('output') for entry in self.entries}
+        self.done = set(self.outputs)
+        self.done.update(output for output in self.outputs.values() if output)
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def is_done(self, path):
+        return to_asset_path(path) in self.done
+
+    def commit(self, source, output):
+        entry = {'source': to_asset_path(source), 'output': to_asset_path(output) if output else None}
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        # Counted once written: close() flushes it even if fsync is interrupted
+        self.committed += 1
+        self.outputs[entry['source']] = entry['output']
+        self.done.update(value for value in entry.values() if isinstance(value, str))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def output_of(self, path):
+        return self.outputs.get(to_asset_path(path))
+
+    def close(self):
+        self.file.close()
+
+def remove_stale_temp_files(directory):
+    """Delete half-written outputs left by an interrupted run"""
+    removed = 0
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            if file.endswith(TEMP_SUFFIX):
+                os.remove(os.path.join(root, file))
+                removed += 1
+    if removed:
+        print(f"Removed {removed} half-written temp files from an interrupted run")
+
+def pending_images(image_files, journal):
+    """
+    Images still to optimize, settling PNG -> JPEG conversions cut short by
+    a crash: a JPEG next to an unfinished PNG is redone from the PNG instead
+    of being re-encoded, and a converted PNG that wasn't removed yet is.
+    """
+    sources = set(image_files)
+    pending = []
+    for path in image_files:
+        stem, ext = os.path.splitext(path)
+        if ext.lower() == '.png':
+            output = journal.output_of(path)
+            if output and output != to_asset_path(path):
+                os.remove(path)
+                continue
+        elif stem + '.png' in sources and not journal.is_done(stem + '.png'):
+            continue
+        if not journal.is_done(path):
+            pending.append(path)
+    return pending
+
 def get_file_size_mb(path):
     """Get file size in MB"""
     return os.path.getsize(path) / (1024 * 1024)
 
-def optimize_directory(directory):
-    """Optimize all images in a directory"""
+def find_images(directory):
+    """List source images in a directory, skipping ' 2' copies"""
     image_extensions = {'.png', '.jpg', '.jpeg'}
 
-    total_before = 0
-    total_after = 0
-    optimized_count = 0
-
-    # Get all image files
     image_files = []
     for root, dirs, files in os.walk(directory):
-        for file in files:
+        dirs.sort()
+        for file in sorted(files):
             if any(file.lower().endswith(ext) for ext in image_extensions):
                 # Skip files with "2" in name (duplicates)
                 if ' 2.' in file:
                     continue
                 image_files.append(os.path.join(root, file))
+    return image_files
+
+def optimize_directory(directory, resume=False, restart=False):
+    """Optimize all images in a directory"""
+    total_before = 0
+    total_after = 0
+    optimized_count = 0
+
+    remove_stale_temp_files(directory)
+    journal = Journal(JOURNAL_PATH, resume, restart)
+
+    image_files = find_images(directory)
+    pending = pending_images(image_files, journal)
 
     print(f"Found {len(image_files)} images to optimize")
+    if resume:
+        print(f"Resuming: {len(image_files) - len(pending)} already done ({JOURNAL_PATH})")
     print("=" * 60)
 
-    for i, img_path in enumerate(image_files, 1):
-        size_before = get_file_size_mb(img_path)
-        total_before += size_before
+    try:
+        for i, img_path in enumerate(pending, 1):
+            size_before = get_file_size_mb(img_path)
+            total_before += size_before
+
+            result_path = optimize_image(img_path)
 
-        result_path = optimize_image(img_path)
+            if result_path:
+                journal.commit(img_path, result_path)
+                if result_path != img_path:
+                    os.remove(img_path)  # PNG converted to JPEG
 
-        if result_path:
-            size_after = get_file_size_mb(result_path)
-            total_after += size_after
-            reduction = ((size_before - size_after) / size_before * 100) if size_before > 0 else 0
+                size_after = get_file_size_mb(result_path)
+                total_after += size_after
+                reduction = ((size_before - size_after) / size_before * 100) if size_before > 0 else 0
 
-            optimized_count += 1
+                optimized_count += 1
 
-            if i % 10 == 0 or reduction > 50:
-                print(f"[{i}/{len(image_files)}] {os.path.basename(img_path)}: "
-                      f"{size_before:.2f}MB → {size_after:.2f}MB ({reduction:.1f}% reduction)")
+                if i % 10 == 0 or reduction > 50:
+                    print(f"[{i}/{len(pending)}] {os.path.basename(img_path)}: "
+                          f"{size_before:.2f}MB → {size_after:.2f}MB ({reduction:.1f}% reduction)")
+    except KeyboardInterrupt:
+        print(f"\nInterrupted after {journal.committed} images. Continue with --resume")
+        raise SystemExit(130)
+    finally:
+        journal.close()
 
     print("=" * 60)
     print(f"\nOptimization Complete!")
     print(f"Images processed: {optimized_count}")
+    if optimized_count == 0:
+        return
     print(f"Total size before: {total_before:.1f} MB")
     print(f"Total size after: {total_after:.1f} MB")
     print(f"Total reduction: {total_before - total_after:.1f} MB ({((total_before - total_after) / total_before * 100):.1f}%)")
     print(f"Average size per image: {(total_after / optimized_count * 1024):.0f} KB")
 
+def encode_jpeg(input_path, ssim_floor=None, report=None):
+    """Optimize a single image file into JPEG bytes without touching the source"""
+    with Image.open(input_path) as img:
+        img = prepare_image(img)
+        return encode_output(img, ssim_floor, report, to_asset_path(input_path))
+
+def to_asset_path(path):
+    """Normalize a file path to the 'assets/...' form used in cards.json"""
+    return Path(os.path.relpath(path)).as_posix()
+
+def content_address_directory(directory, ssim_floor=None, report=None):
+    """
+    Store optimized images under their content hash.
+
+    Every source image is encoded once, named after the SHA-256 of the
+    encoded bytes and written to CAS_DIR. Byte-identical sources and
+    identical encodings collapse to one stored object. The original ->
+    hashed mapping is written to ASSET_MAP_PATH, cards.json is rewritten
+    through it and MANIFEST_PATH lists CAS_DIR instead of the topic
+    folders, so the sources (left in place) are no longer packaged. Cards
+    that could not be mapped keep their image, listed in the manifest
+    next to CAS_DIR, and objects no card uses any more are deleted.
+    """
+    image_files = find_images(directory)
+    os.makedirs(CAS_DIR, exist_ok=True)
+
+    print(f"Found {len(image_files)} images to content-address")
+    print("=" * 60)
+
+    asset_map = {}
+    encoded_by_source = {}  # source sha256 -> hashed asset path
+    stored = set()
+    total_source = 0
+    total_stored = 0
+    source_duplicates = 0
+    output_duplicates = 0
+
+    for i, img_path in enumerate(image_files, 1):
+        with open(img_path, 'rb') as f:
+            source_digest = hashlib.sha256(f.read()).hexdigest()
+        total_source += os.path.getsize(img_path)
+
+        if source_digest in encoded_by_source:
+            # Same bytes under another name: no need to encode again
+            asset_map[to_asset_path(img_path)] = encoded_by_source[source_digest]
+            source_duplicates += 1
+            continue
+
+        try:
+            data = encode_jpeg(img_path, ssim_floor, report)
+        except Exception as e:
+            print(f"Error optimizing {img_path}: {e}")
+            continue
+
+        digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+        hashed_path = f"{CAS_DIR}/{digest}.jpg"
+
+        if hashed_path in stored:
+            output_duplicates += 1
+        else:
+            if not os.path.exists(hashed_path):
+                write_atomic(hashed_path, data)
+            stored.add(hashed_path)
+            total_stored += len(data)
+
+        encoded_by_source[source_digest] = hashed_path
+        asset_map[to_asset_path(img_path)] = hashed_path
+
+        if i % 50 == 0:
+            print(f"[{i}/{len(image_files)}] {len(stored)} objects stored")
+
+    asset_map_json = json.dumps({'version': 1, 'assets': asset_map}, ensure_ascii=False, indent=2, sort_keys=True)
+    write_atomic(ASSET_MAP_PATH, asset_map_json.encode('utf-8'))
+
+    rewritten, unmapped = rewrite_card_assets(asset_map)
+    removed = remove_stale_objects(asset_map)
+
+    # Unmapped cards still load their source image, so it has to stay bundled
+    unmapped_assets = sorted({
+        path
+        for image_path in unmapped.values()
+        for path in [image_path, *gray_variants(image_path)]
+        if os.path.exists(path) and not path.startswith(f"{CAS_DIR}/")
+    })
+    write_manifest([f"{CAS_DIR}/", *unmapped_assets], MANIFEST_PATH)
+
+    print("=" * 60)
+    print(f"\nContent addressing complete!")
+    print(f"Images mapped: {len(asset_map)}")
+    print(f"Objects stored: {len(stored)}")
+    print(f"Duplicate sources collapsed: {source_duplicates}")
+    print(f"Duplicate encodings collapsed: {output_duplicates}")
+    print(f"Total size before: {total_source / (1024 * 1024):.1f} MB")
+    print(f"Total size stored: {total_stored / (1024 * 1024):.1f} MB")
+    print(f"Stale objects removed: {removed}")
+    print(f"Cards rewritten: {rewritten}")
+    if unmapped:
+        print(f"⚠️  Cards without a mapped image: {len(unmapped)} ({', '.join(list(unmapped)[:10])})")
+        print(f"   {len(unmapped_assets)} of their images are bundled from source via the manifest")
+    print(f"Mapping table: {ASSET_MAP_PATH}")
+    print(f"Asset manifest: {MANIFEST_PATH} (replace the `assets:` block in pubspec.yaml)")
+
+def gray_source(image_source, asset_map):
+    """Gray variant of a source image following the <name>_gray.<ext> convention"""
+    stem = image_source.rsplit('.', 1)[0]
+    for ext in ('.jpg', '.png', '.jpeg'):
+        if f"{stem}_gray{ext}" in asset_map:
+            return f"{stem}_gray{ext}"
+    return None
+
+def rewrite_card_assets(asset_map):
+    """
+    Point image_asset (and image_gray_asset) in cards.json at hashed paths,
+    returns (rewritten, {unmapped card id: its image_asset}).
+
+    Each card keeps its original path in image_source, so later runs
+    resolve from the source even when several sources share one hash.
+    """
+    if not os.path.exists(CARDS_PATH):
+        print(f"Warning: {CARDS_PATH} not found, cards not rewritten")
+        return 0, {}
+
+    with open(CARDS_PATH, 'r', encoding='utf-8') as f:
+        cards = json.load(f)
+
+    rewritten = 0
+    unmapped = {}
+    for card in cards:
+        image_source = card.get('image_source', card.get('image_asset', ''))
+        # Keys are normalized by to_asset_path, some cards use stadt/../fahrzeug/
+        image_source = posixpath.normpath(image_source) if image_source else ''
+        hashed = asset_map.get(image_source)
+        if hashed is None:
+            image_asset = card.get('image_asset', '')
+            unmapped[card.get('id', 'unknown')] = posixpath.normpath(image_asset) if image_asset else ''
+            continue
+
+        gray = gray_source(image_source, asset_map)
+        gray_hashed = asset_map[gray] if gray else None
+        if hashed != card.get('image_asset') or gray_hashed != card.get('image_gray_asset'):
+            rewritten += 1
+
+        card['image_asset'] = hashed
+        card['image_source'] = image_source
+        if gray_hashed:
+            card['image_gray_asset'] = gray_hashed
+        else:
+            card.pop('image_gray_asset', None)
+
+    write_atomic(CARDS_PATH, json.dumps(cards, ensure_ascii=False, indent=2).encode('utf-8'))
+
+    return rewritten, unmapped
+
+def remove_stale_objects(asset_map):
+    """
+    Delete CAS_DIR objects that neither asset_map nor a card in cards.json
+    points at (left over from images that changed), returns the count
+    """
+    in_use = set(asset_map.values())
+    if os.path.exists(CARDS_PATH):
+        with open(CARDS_PATH, 'r', encoding='utf-8') as f:
+            cards = json.load(f)
+        in_use.update(card.get(field) for card in cards for field in ('image_asset', 'image_gray_asset'))
+
+    removed = 0
+    for file in os.listdir(CAS_DIR):
+        path = f"{CAS_DIR}/{file}"
+        if path not in in_use:
+            os.remove(path)
+            removed += 1
+    return removed
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='LearnIQ Image Optimization Script')
+    parser.add_argument('--content-addressed', action='store_true',
+                        help=f'store optimized images by content hash in {CAS_DIR}/, rewrite cards.json '
+                             f'through {ASSET_MAP_PATH} and write {MANIFEST_PATH} (sources are kept)')
+    journal = parser.add_mutually_exclusive_group()
+    journal.add_argument('--resume', action='store_true',
+                        help=f'skip images already finished according to {JOURNAL_PATH} '
+                             '(in-place mode)')
+    journal.add_argument('--restart', action='store_true',
+                        help=f'discard {JOURNAL_PATH} and optimize every image again (in-place mode)')
+    parser.add_argument('--perceptual', action='store_true',
+                        help='pick the lowest quality, chroma subsampling and progressive setting '
+                             'that keeps luma MS-SSIM above --ssim-floor (needs numpy and --content-addressed)')
+    parser.add_argument('--ssim-floor', type=float, default=SSIM_FLOOR,
+                        help='minimum MS-SSIM for --perceptual (default: %(default)s)')
+    parser.add_argument('--report', default=REPORT_PATH,
+                        help='per-image score report for --perceptual (default: %(default)s)')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
     assets_dir = 'assets/images'
 
     if not os.path.exists(assets_dir):
@@ -122,8 +622,28 @@ if __name__ == '__main__':
     print("=" * 60)
     print(f"Target: Reduce images to ~{TARGET_SIZE_KB}KB each")
     print(f"Max dimensions: {MAX_WIDTH}x{MAX_HEIGHT}px")
-    print(f"JPEG quality: {QUALITY}%")
+    if args.perceptual:
+        if not args.content_addressed:
+            # In place, a rerun would score the last lossy output against itself
+            # and walk the quality down a notch every time
+            print("Error: --perceptual needs --content-addressed (sources must stay untouched)")
+            sys.exit(1)
+        if np is None:
+            print("Error: --perceptual needs numpy (pip install numpy)")
+            sys.exit(1)
+        print(f"JPEG quality: {MIN_QUALITY}-{MAX_QUALITY}% (MS-SSIM >= {args.ssim_floor})")
+    else:
+        print(f"JPEG quality: {QUALITY}%")
     print("=" * 60)
     print()
 
-    optimize_directory(assets_dir)
+    ssim_floor = args.ssim_floor if args.perceptual else None
+    report = [] if args.perceptual else None
+
+    if args.content_addressed:
+        content_address_directory(assets_dir, ssim_floor, report)
+    else:
+        optimize_directory(assets_dir, args.resume, args.restart)
+
+    if report is not None:
+        write_report(report, args.report)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Asset Pruner for LearnIQ
+Cross-references assets/images and assets/cas with cards.json, the _gray
+variant convention (or image_gray_asset) and topics.json in one pass over
+the tree.
+
+Reports:
+  - orphaned images: files no card (or gray variant of a card) uses
+  - kept sources: originals of content-addressed cards (image_source),
+    not bundled but never quarantined since the next run encodes them
+  - dangling references: card images that don't exist on disk
+  - topic folders without a topic and topics without a folder
+
+Writes the exact asset list for the build (a pubspec.yaml `assets:` block)
+and can move orphans to a quarantine folder outside the bundle.
+
+Usage:
+    python3 scripts/prune_assets.py                # report + asset_manifest.yaml
+    python3 scripts/prune_assets.py --quarantine   # also move orphans away
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import shutil
+from pathlib import Path
+
+IMAGES_DIR = 'assets/images'
+CAS_DIR = 'assets/cas'  # optimize_images.py --content-addressed
+CARDS_PATH = Path('assets/data/cards.json')
+TOPICS_PATH = Path('assets/data/topics.json')
+MANIFEST_PATH = Path('asset_manifest.yaml')
+QUARANTINE_DIR = Path('assets_quarantine')
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Bundled as whole folders, not image assets
+STATIC_ASSET_DIRS = ['assets/', 'assets/data/', 'assets/animations/']
+
+
+def load_json(path, default):
+    if not path.exists():
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def gray_variants(image_path):
+    """Paths the app tries for the gray version of an image (see test_screen.dart)"""
+    directory, file_name = image_path.rsplit('/', 1)
+    stem = file_name.split('.')[0]
+    return [f"{directory}/{stem}_gray.png", f"{directory}/{stem}_gray.jpg"]
+
+
+def scan_images():
+    """All image files under IMAGES_DIR and CAS_DIR with their sizes, keyed by asset path"""
+    images = {}
+    for directory in (IMAGES_DIR, CAS_DIR):
+        for root, dirs, files in os.walk(directory):
+            for file in files:
+                if file.lower().endswith(IMAGE_EXTENSIONS):
+                    full_path = os.path.join(root, file)
+                    rel_path = Path(os.path.relpath(full_path)).as_posix()
+                    images[rel_path] = os.path.getsize(full_path)
+    return images
+
+
+def referenced_assets(cards):
+    """
+    Asset paths the app can load: card images plus their gray variants
+    (image_gray_asset when set, the _gray naming convention otherwise).
+    Returns (referenced, card image paths, sources), sources being the
+    image_source originals of content-addressed cards and their gray variants.
+    """
+    referenced = set()
+    card_images = {}
+    sources = set()
+    for card in cards:
+        if card.get('image_source'):
+            image_source = posixpath.normpath(card['image_source'])
+            sources.add(image_source)
+            sources.update(gray_variants(image_source))
+
+        image_path = card.get('image_asset', '')
+        if not image_path:
+            continue
+        # scan_images() paths are normalized, some cards use stadt/../fahrzeug/
+        image_path = posixpath.normpath(image_path)
+        card_images[card.get('id', 'unknown')] = image_path
+        referenced.add(image_path)
+
+        if card.get('image_gray_asset'):
+            referenced.add(posixpath.normpath(card['image_gray_asset']))
+        else:
+            referenced.update(gray_variants(image_path))
+
+    return referenced, card_images, sources
+
+
+def format_mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def write_manifest(asset_paths, path):
+    """pubspec.yaml-ready asset list: static folders plus the given images/folders"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Generated by scripts/prune_assets.py / optimize_images.py - do not edit.\n")
+        f.write("# Replace the `assets:` block in pubspec.yaml with this list.\n")
+        f.write("flutter:\n  assets:\n")
+        for asset_dir in STATIC_ASSET_DIRS:
+            f.write(f"    - {asset_dir}\n")
+        for image_path in sorted(asset_paths):
+            f.write(f"    - {json.dumps(image_path, ensure_ascii=False)}\n")
+
+
+def quarantine(orphans):
+    """Move orphans to QUARANTINE_DIR keeping their relative paths"""
+    for image_path in orphans:
+        target = QUARANTINE_DIR / image_path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(image_path, target)
+
+
+def prune_assets(move_orphans, manifest_path):
+    cards = load_json(CARDS_PATH, None)
+    if cards is None:
+        print(f"Error: {CARDS_PATH} not found")
+        return False
+
+    topics = load_json(TOPICS_PATH, [])
+
+    images = scan_images()
+    referenced, card_images, sources = referenced_assets(cards)
+
+    used = {path for path in images if path in referenced}
+    kept = {path for path in images if path in sources and path not in referenced}
+    orphans = sorted(path for path in images if path not in referenced and path not in sources)
+    dangling = sorted((card_id, path) for card_id, path in card_images.items() if path not in images)
+
+    folders = {path.split('/')[2] for path in images if path.count('/') >= 3}
+    topic_ids = {topic['id'] for topic in topics}
+
+    total_bytes = sum(images.values())
+    used_bytes = sum(images[path] for path in used)
+    kept_bytes = sum(images[path] for path in kept)
+    orphan_bytes = sum(images[path] for path in orphans)
+
+    print(f"Scanned {len(images)} images ({format_mb(total_bytes)}) against {len(cards)} cards")
+    print("=" * 60)
+
+    print(f"\n✅ Referenced: {len(used)} files ({format_mb(used_bytes)})")
+    if kept:
+        print(f"📦 Kept sources (not bundled): {len(kept)} files ({format_mb(kept_bytes)})")
+    print(f"🗑  Orphaned: {len(orphans)} files ({format_mb(orphan_bytes)})")
+    for path in orphans[:20]:
+        print(f"  - {path} ({images[path] // 1024} KB)")
+    if len(orphans) > 20:
+        print(f"  ... and {len(orphans) - 20} more")
+
+    print(f"\n❌ Dangling references: {len(dangling)}")
+    for card_id, path in dangling[:20]:
+        print(f"  - {card_id}: {path}")
+    if len(dangling) > 20:
+        print(f"  ... and {len(dangling) - 20} more")
+
+    for folder in sorted(folders - topic_ids):
+        print(f"⚠️  Folder {IMAGES_DIR}/{folder}/ has no topic in {TOPICS_PATH}")
+    for topic_id in sorted(topic_ids - folders):
+        print(f"⚠️  Topic {topic_id} has no folder in {IMAGES_DIR}/")
+
+    write_manifest(used, manifest_path)
+    print(f"\nAsset manifest ({len(used)} images): {manifest_path}")
+
+    if move_orphans and orphans:
+        quarantine(orphans)
+        print(f"Moved {len(orphans)} orphans ({format_mb(orphan_bytes)}) to {QUARANTINE_DIR}/")
+
+    return not dangling
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Find orphaned and dangling image assets')
+    parser.add_argument('--quarantine', action='store_true',
+                        help=f'move orphaned images to {QUARANTINE_DIR}/ (outside the bundle)')
+    parser.add_argument('--manifest', type=Path, default=MANIFEST_PATH,
+                        help='where to write the asset list (default: %(default)s)')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    # Change to project root
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    os.chdir(project_root)
+
+    success = prune_assets(args.quarantine, args.manifest)
+    exit(0 if success else 1)
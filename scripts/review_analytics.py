@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Review Log Analytics for LearnIQ
+Streams exported SM-2 review logs (JSON Lines, optionally .gz) and builds a
+per-card difficulty table that generate_cards.py can embed.
+
+Each line is one CardReview as stored under card_review_<id>:
+    {"cardId": "...", "topicId": "...", "easinessFactor": 2.36,
+     "repetitions": 3, "intervalDays": 15, "totalReviews": 7,
+     "correctReviews": 5, ...}
+
+Memory use depends on the number of distinct cards, not on the size of the
+log: lines are parsed in fixed-size chunks and folded into per-card NumPy
+counters and fixed-bin histograms.
+
+Usage:
+    python3 scripts/review_analytics.py reviews.jsonl [more.jsonl.gz ...]
+    python3 scripts/review_analytics.py - < reviews.jsonl
+"""
+
+import argparse
+import gzip
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+OUTPUT_PATH = Path('assets/data/card_difficulty.json')
+CHUNK_SIZE = 50_000  # Lines parsed before folding into the counters
+
+# SM-2 easiness factor is clamped to [1.3, 2.5]
+EF_MIN = 1.3
+EF_MAX = 2.5
+EF_BINS = np.linspace(EF_MIN, EF_MAX, 13)  # 12 bins of 0.1
+
+# Interval bins in days: 0, 1, 2-3, 4-7, ... (powers of two), last bin open
+INTERVAL_BINS = np.array([0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, np.inf])
+
+FIELDS = ['reviews', 'lapse_rate', 'ease_mean', 'ease_p10', 'interval_median', 'difficulty']
+
+
+class CardStats:
+    """Per-card counters, grown as new card ids appear in the log"""
+
+    def __init__(self):
+        self.index = {}  # cardId -> row
+        self.topic = []
+        self.capacity = 0
+        self.snapshots = np.zeros(0, dtype=np.int64)
+        self.reviews = np.zeros(0, dtype=np.int64)
+        self.lapses = np.zeros(0, dtype=np.int64)
+        self.ease_sum = np.zeros(0, dtype=np.float64)
+        self.ease_hist = np.zeros((0, len(EF_BINS) - 1), dtype=np.int64)
+        self.interval_hist = np.zeros((0, len(INTERVAL_BINS) - 1), dtype=np.int64)
+
+    def rows_for(self, card_ids, topic_ids):
+        """Map card ids to counter rows, allocating rows for new cards"""
+        rows = np.empty(len(card_ids), dtype=np.int64)
+        for i, (card_id, topic_id) in enumerate(zip(card_ids, topic_ids)):
+            row = self.index.get(card_id)
+            if row is None:
+                row = len(self.index)
+                self.index[card_id] = row
+                self.topic.append(topic_id)
+            rows[i] = row
+        self._grow(len(self.index))
+        return rows
+
+    def _grow(self, needed):
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2, 64)
+        extra = capacity - self.capacity
+        self.snapshots = np.concatenate([self.snapshots, np.zeros(extra, dtype=np.int64)])
+        self.reviews = np.concatenate([self.reviews, np.zeros(extra, dtype=np.int64)])
+        self.lapses = np.concatenate([self.lapses, np.zeros(extra, dtype=np.int64)])
+        self.ease_sum = np.concatenate([self.ease_sum, np.zeros(extra)])
+        self.ease_hist = np.vstack([self.ease_hist, np.zeros((extra, self.ease_hist.shape[1]), dtype=np.int64)])
+        self.interval_hist = np.vstack([self.interval_hist, np.zeros((extra, self.interval_hist.shape[1]), dtype=np.int64)])
+        self.capacity = capacity
+
+    def add_chunk(self, card_ids, topic_ids, ease, interval, total, correct):
+        """Fold one parsed chunk into the counters"""
+        rows = self.rows_for(card_ids, topic_ids)
+        ease = np.clip(np.asarray(ease, dtype=np.float64), EF_MIN, EF_MAX)
+        interval = np.maximum(np.asarray(interval, dtype=np.float64), 0)
+        total = np.asarray(total, dtype=np.int64)
+        correct = np.minimum(np.asarray(correct, dtype=np.int64), total)
+
+        np.add.at(self.snapshots, rows, 1)
+        np.add.at(self.reviews, rows, total)
+        np.add.at(self.lapses, rows, total - correct)
+        np.add.at(self.ease_sum, rows, ease)
+
+        ease_bin = np.clip(np.searchsorted(EF_BINS, ease, side='right') - 1, 0, len(EF_BINS) - 2)
+        interval_bin = np.clip(np.searchsorted(INTERVAL_BINS, interval, side='right') - 1, 0, len(INTERVAL_BINS) - 2)
+        np.add.at(self.ease_hist, (rows, ease_bin), 1)
+        np.add.at(self.interval_hist, (rows, interval_bin), 1)
+
+
+def histogram_quantile(hist, edges, q):
+    """Per-row quantile read off cumulative histograms (lower bin edge)"""
+    cumulative = np.cumsum(hist, axis=1)
+    target = cumulative[:, -1:] * q
+    bins = np.argmax(cumulative >= np.maximum(target, 1), axis=1)
+    return edges[bins]
+
+
+def open_log(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def stream_logs(paths, stats):
+    """Parse logs line by line and fold them into stats, returns (lines, skipped)"""
+    columns = ([], [], [], [], [], [])
+    lines = 0
+    skipped = 0
+
+    def flush():
+        if columns[0]:
+            stats.add_chunk(*columns)
+            for column in columns:
+                column.clear()
+
+    for path in paths:
+        with open_log(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                lines += 1
+                try:
+                    record = json.loads(line)
+                    numbers = [float(record['easinessFactor']), float(record['intervalDays']),
+                               float(record.get('totalReviews', 0)), float(record.get('correctReviews', 0))]
+                    # NaN would poison the card's sums, Infinity can't become an int
+                    if not all(math.isfinite(number) for number in numbers):
+                        skipped += 1
+                        continue
+                    values = (
+                        str(record['cardId']),
+                        str(record.get('topicId', '')),
+                        numbers[0],
+                        int(numbers[1]),
+                        int(numbers[2]),
+                        int(numbers[3]),
+                    )
+                except (ValueError, KeyError, TypeError, OverflowError):
+                    skipped += 1
+                    continue
+                for column, value in zip(columns, values):
+                    column.append(value)
+                if len(columns[0]) >= CHUNK_SIZE:
+                    flush()
+    flush()
+    return lines, skipped
+
+
+def build_table(stats, min_reviews):
+    """Compact per-card difficulty table (one row of FIELDS per card)"""
+    n = len(stats.index)
+    snapshots = stats.snapshots[:n]
+    reviews = stats.reviews[:n]
+    lapse_rate = np.divide(stats.lapses[:n], reviews, out=np.zeros(n), where=reviews > 0)
+    ease_mean = stats.ease_sum[:n] / np.maximum(snapshots, 1)
+    ease_p10 = histogram_quantile(stats.ease_hist[:n], EF_BINS, 0.10)
+    interval_median = histogram_quantile(stats.interval_hist[:n], INTERVAL_BINS, 0.50)
+
+    # 0 = easy, 1 = hard: lapses weigh more than a low easiness factor
+    ease_penalty = (EF_MAX - ease_mean) / (EF_MAX - EF_MIN)
+    difficulty = np.clip(0.6 * lapse_rate + 0.4 * ease_penalty, 0.0, 1.0)
+
+    cards = {}
+    for card_id, row in stats.index.items():
+        if reviews[row] < min_reviews:
+            continue
+        cards[card_id] = [
+            int(reviews[row]),
+            round(float(lapse_rate[row]), 3),
+            round(float(ease_mean[row]), 2),
+            round(float(ease_p10[row]), 2),
+            int(interval_median[row]),
+            round(float(difficulty[row]), 3),
+        ]
+    return {'version': 1, 'fields': FIELDS, 'cards': cards}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Aggregate exported SM-2 review logs into a per-card difficulty table')
+    parser.add_argument('logs', nargs='+', help="JSON Lines review exports ('-' for stdin, .gz supported)")
+    parser.add_argument('--output', default=str(OUTPUT_PATH), help='difficulty table path (default: %(default)s)')
+    parser.add_argument('--min-reviews', type=int, default=5,
+                        help='drop cards with fewer total reviews (default: %(default)s)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("LearnIQ Review Analytics")
+    print("=" * 60)
+
+    stats = CardStats()
+    lines, skipped = stream_logs(args.logs, stats)
+    table = build_table(stats, args.min_reviews)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Lines read: {lines} ({skipped} skipped)")
+    print(f"Cards seen: {len(stats.index)}")
+    print(f"Cards in table: {len(table['cards'])} (min {args.min_reviews} reviews)")
+
+    hardest = sorted(table['cards'].items(), key=lambda item: item[1][-1], reverse=True)[:10]
+    if hardest:
+        print("\nHardest cards:")
+        for card_id, row in hardest:
+            print(f"  {card_id:16} lapse {row[1] * 100:5.1f}%  EF {row[2]:.2f}  difficulty {row[-1]:.3f}")
+
+    print(f"\nSaved to: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+import 'package:flutter_test/flutter_test.dart';
+import 'package:learniq/services/image_service.dart';
+
+void main() {
+  group('ImageService', () {
+    final topic = <String, dynamic>{
+      'first_screen': ['a.jpg', 'b.jpg', 'c.jpg'],
+      'batches': [
+        ['d.jpg', 'e.jpg'],
+        ['f.jpg', 'g.jpg'],
+        ['h.jpg'],
+      ],
+    };
+
+    setUp(() {
+      ImageService.setPreloadPlan({'tiere': topic});
+      ImageService.clearCache();
+    });
+
+    tearDown(() {
+      ImageService.setPreloadPlan(null);
+    });
+
+    test('topicWaves starts with the first screen', () {
+      final waves = ImageService.topicWaves(topic);
+
+      expect(waves, [
+        ['a.jpg', 'b.jpg', 'c.jpg'],
+        ['d.jpg', 'e.jpg'],
+      ]);
+    });
+
+    test('topicWaves skips batches before the current card', () {
+      final waves = ImageService.topicWaves(topic, fromIndex: 4, maxBatches: 2);
+
+      expect(waves, [
+        ['d.jpg', 'e.jpg'],
+        ['f.jpg', 'g.jpg'],
+      ]);
+    });
+
+    test('topicWaves is empty past the last batch', () {
+      expect(ImageService.topicWaves(topic, fromIndex: 8), isEmpty);
+    });
+
+    test('topicWaves counts cards without an image but skips loading them', () {
+      final waves = ImageService.topicWaves({
+        'first_screen': ['a.jpg', '', 'c.jpg'],
+        'batches': [
+          ['', 'e.jpg'],
+          ['f.jpg'],
+        ],
+      }, fromIndex: 3, maxBatches: 1);
+
+      expect(waves, [
+        ['e.jpg'],
+      ]);
+    });
+
+    test('topicWaves tolerates malformed plans', () {
+      final waves = ImageService.topicWaves({'first_screen': 'a.jpg', 'batches': [3, ['d.jpg', 4]]});
+
+      expect(waves, [
+        ['d.jpg'],
+      ]);
+    });
+
+    test('preloadTopic loads nothing once cancelled', () async {
+      await ImageService.preloadTopic('tiere', isCancelled: () => true);
+
+      expect(ImageService.getCacheSize(), 0);
+    });
+
+    test('preloadTopic with no plan and no fallback loads nothing', () async {
+      await ImageService.preloadTopic('unknown_topic');
+
+      expect(ImageService.getCacheSize(), 0);
+    });
+  });
+}